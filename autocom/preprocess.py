@@ -1,4 +1,9 @@
-import re
+import string
+
+# Every ASCII byte except lower case letters and space
+_NON_ALPHABETIC_BYTES = bytes(
+    b for b in range(128) if chr(b) not in string.ascii_lowercase + " "
+)
 
 
 def clean_text(text: str) -> str:
@@ -9,8 +14,13 @@ def clean_text(text: str) -> str:
     """
     # Force lower
     text = text.lower()
-    # Remove non alphabetic and space characters
-    text = re.sub('[^a-z ]', '', text)
+    # Remove non alphabetic and space characters. Encoding drops everything outside
+    # ASCII and a single translate drops the rest.
+    text = (
+        text.encode("ascii", "ignore")
+        .translate(None, _NON_ALPHABETIC_BYTES)
+        .decode("ascii")
+    )
     # Deduplicate white space
     text = " ".join(text.split())
     return text
@@ -1,8 +1,6 @@
-def create_latex_file(input_filename, output_filename, title, author, words_per_page=150):
-    with open(input_filename, 'r') as f:
-        text = f.read()
+from itertools import islice
 
-    latex_preamble = fr"""\documentclass[14pt]{{book}}
+LATEX_PREAMBLE_TEMPLATE = r"""\documentclass[14pt]{{book}}
 \usepackage[utf8]{{inputenc}}
 \usepackage[T1]{{fontenc}}
 \usepackage{{setspace}}
@@ -20,21 +18,43 @@ def create_latex_file(input_filename, output_filename, title, author, words_per_
 \doublespacing
 """
 
-    latex_postamble = r"""\end{document}"""
+LATEX_PAGE_BREAK = "\n\n\\newpage\n\\null\n\\newpage\n"
+
+LATEX_POSTAMBLE = r"""\end{document}"""
+
+# Every word is followed by a space, and a full page is followed by a page break
+_FULL_PAGE_SUFFIX = " " + LATEX_PAGE_BREAK
+
+
+def iter_words(lines):
+    """
+    Yield the white space separated words of an iterable of lines, e.g. an open file.
+    """
+    for line in lines:
+        yield from line.split()
+
+
+def create_latex_file(input_filename, output_filename, title, author, words_per_page=150):
+    latex_preamble = LATEX_PREAMBLE_TEMPLATE.format(title=title, author=author)
 
-    with open(output_filename, 'w') as f:
-        f.write(latex_preamble)
+    if words_per_page < 1:
+        raise ValueError("words_per_page must be at least 1")
 
-        words = text.split()
-        word_count = 0
-        for word in words:
-            word_count += 1
-            f.write(f"{word} ")
+    # Stream the input so only the current line is held in memory, and encode and
+    # write a page at a time rather than a word at a time
+    with open(input_filename, 'r', encoding='utf-8') as text_file, open(output_filename, 'wb') as f:
+        f.write(latex_preamble.encode('utf-8'))
 
-            if word_count % words_per_page == 0:
-                f.write("\n\n\\newpage\n\\null\n\\newpage\n")
+        words = iter_words(text_file)
+        while True:
+            page_words = list(islice(words, words_per_page))
+            if not page_words:
+                break
+            page = " ".join(page_words)
+            page += _FULL_PAGE_SUFFIX if len(page_words) == words_per_page else " "
+            f.write(page.encode('utf-8'))
 
-        f.write(latex_postamble)
+        f.write(LATEX_POSTAMBLE.encode('utf-8'))
 
 if __name__ == "__main__":
     input_text = "sample_latin_text.txt"
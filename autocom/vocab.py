@@ -1,16 +1,59 @@
+import hashlib
+import importlib.metadata
 import json
+import os
 import re
+import sys
+import tempfile
 from collections import Counter
 from dataclasses import dataclass
-from itertools import chain
-from typing import Dict, List, Tuple, Union
+from functools import lru_cache
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple, Union
 
 from cltk.alphabet.lat import dehyphenate, drop_latin_punctuation, normalize_lat
 from cltk.lemmatize.lat import LatinBackoffLemmatizer
 from cltk.ner.ner import tag_ner
 from cltk.sentence.lat import LatinPunktSentenceTokenizer
-from tqdm import tqdm
-from whitakers_words.parser import Parser
+
+if TYPE_CHECKING:
+    from whitakers_words.parser import Parser
+
+_PUNCTUATION_PATTERN = re.compile(r"[^a-zA-Z.?!\s]")
+_DUPLICATE_WHITE_SPACE_PATTERN = re.compile(r"\s\s+")
+_END_OF_SENTENCE_TABLE = str.maketrans("!?", "..")
+# Matches all numerals except vix
+_NUMERAL_PATTERN = re.compile(r"^(?![vV]im|[dD][īi]c[īi])*[IīVXLCDMiīvxlcdm]*(?<!vix)$")
+_NON_ALPHABETIC_PATTERN = re.compile(r"[^a-z]")
+_NON_ALPHABETIC_OR_SPACE_PATTERN = re.compile(r"[^a-z ]")
+
+# Words ending in -que that are not the enclitic
+_QUE_INCLUDE = frozenset(
+    [
+        "usque",
+        "denique",
+        "itaque",
+        "uterque",
+        "ubique",
+        "undique",
+        "utique",
+        "utrimque",
+        "plerique",
+    ]
+)
+_VOWELS = frozenset(["a", "e", "i", "o", "u", "y"])
+
+# Bump when anything in process_text's pipeline changes so cached frequencies are not reused
+_FREQUENCY_CACHE_VERSION = 1
+
+_LEMMA_EXCEPTIONS_PATH = os.path.join(os.path.dirname(__file__), "exceptions.json")
+
+
+@lru_cache(maxsize=None)
+def _load_lemma_exceptions() -> Dict[str, str]:
+    # Shared by every CorpusAnalytics instance; read only
+    with open(_LEMMA_EXCEPTIONS_PATH) as f:
+        return json.loads(f.read())
 
 
 @dataclass
@@ -30,8 +73,7 @@ class CorpusAnalytics:
             self.sent_tokenizer = LatinPunktSentenceTokenizer()
             if lemmatizer_type == "cltk":
                 self.lemmatizer = LatinBackoffLemmatizer()
-                with open("autocom/exceptions.json") as f:
-                    self.lemma_exceptions = json.loads(f.read())
+                self.lemma_exceptions = _load_lemma_exceptions()
                 self.exclude_list = ["aeeumlre", "aeumlre", "ltcibusgt"]
             else:
                 raise NotImplementedError()
@@ -56,22 +98,18 @@ class CorpusAnalytics:
             ligature_replacement=True,
         )
         # Remove non end of sentence punctuation
-        punc_pattern = re.compile("[^a-zA-Z.?!\s]")
-        clean_text = punc_pattern.sub("", text)
+        clean_text = _PUNCTUATION_PATTERN.sub("", text)
         # Remove duplicate white space
-        duplicate_white_space_pattern = re.compile("\s\s+")
-        clean_text = duplicate_white_space_pattern.sub(" ", clean_text).strip()
+        clean_text = _DUPLICATE_WHITE_SPACE_PATTERN.sub(" ", clean_text).strip()
         # Replace non period end of sentence punc with period
-        eos_pattern = re.compile("[!?]")
-        clean_text = eos_pattern.sub(".", clean_text)
+        clean_text = clean_text.translate(_END_OF_SENTENCE_TABLE)
         if lower:
             return clean_text.lower()
         return clean_text
 
     @staticmethod
     def is_numeral(token: str) -> bool:
-        pattern = r"^(?![vV]im|[dD][īi]c[īi])*[IīVXLCDMiīvxlcdm]*(?<!vix)$"  # matches all numerals except vix
-        match = re.search(pattern, token)
+        match = _NUMERAL_PATTERN.search(token)
         return bool(match)
 
     def clean_lemma(self, token) -> Union[str, None]:
@@ -82,27 +120,15 @@ class CorpusAnalytics:
             if "lr" in token:
                 return None
             # Remove enclitic -que from lemma
-            que_include = [
-                "usque",
-                "denique",
-                "itaque",
-                "uterque",
-                "ubique",
-                "undique",
-                "utique",
-                "utrimque",
-                "plerique",
-            ]
-            if token[-3:] == "que" and token not in que_include:
+            if token[-3:] == "que" and token not in _QUE_INCLUDE:
                 token = token[:-3]
             # Remove enclitic -ve
-            vowels = ["a", "e", "i", "o", "u", "y"]
             if (
                 len(token) > 2
                 and token[-3:] != "que"
                 and (
                     token[-2:] == "ve"
-                    or (token[-2:] == "ue" and token[-3] not in vowels)
+                    or (token[-2:] == "ue" and token[-3] not in _VOWELS)
                 )
             ):
                 token = token[:-2]
@@ -118,40 +144,35 @@ class CorpusAnalytics:
         token = drop_latin_punctuation(token)
         if token in self.lemma_exceptions:
             return self.lemma_exceptions[token]
-        return token.strip().lower()
+        # Intern so repeated lemmata share one string and compare by identity
+        return sys.intern(token.strip().lower())
 
-    def lemmata_freq(self, lemmata: List[Tuple[str, str]]) -> Dict[str, int]:
+    def lemmata_freq(self, lemmata: Iterable[Tuple[str, str]]) -> Dict[str, int]:
         """
         Collate lemmata for vocab frequency.
         Reduces secondary definitions to single lemma. E.g., all "cum2" counts are under "cum".
-        :param lemmata: list of lemmata tuples
+        :param lemmata: iterable of lemmata tuples
         :return: dict of lemmata frequency
         """
-        lemmata = [
-            l[1] for l in lemmata if len(l[1]) > 0
-        ]  # TODO: pull out and put in process_text
-        clean_lemmata = [self.clean_lemma(l) for l in lemmata]
-        freq_dict_temp = dict(Counter(clean_lemmata))
-        freq_dict = {}
-        only_alphabetic_pattern = re.compile("[^a-z]")
-        for k, v in freq_dict_temp.items():
-            if k is None:
+        # Clean, reduce and count each lemma in a single pass. Lemmata repeat heavily,
+        # so each distinct lemma is only cleaned once.
+        freq_dict = Counter()
+        reduced_lemmata = {}
+        for _, lemma in lemmata:
+            if len(lemma) == 0:
                 continue
-            # Check if lemma has any punctuation and reduce, e.g. con-vero -> convero
-            elif (
-                only_alphabetic_pattern.sub("", k) != k
-                and only_alphabetic_pattern.sub("", k) is not None
-            ):
-                try:
-                    freq_dict[only_alphabetic_pattern.sub("", k)] += v
-                except KeyError:
-                    freq_dict[only_alphabetic_pattern.sub("", k)] = v
-            else:
-                try:
-                    freq_dict[k] += v
-                except KeyError:
-                    freq_dict[k] = v
-        return freq_dict
+            if lemma not in reduced_lemmata:
+                clean_lemma = self.clean_lemma(lemma)
+                # Remove any punctuation from lemma, e.g. con-vero -> convero
+                reduced_lemmata[lemma] = (
+                    None
+                    if clean_lemma is None
+                    else _NON_ALPHABETIC_PATTERN.sub("", clean_lemma)
+                )
+            reduced_lemma = reduced_lemmata[lemma]
+            if reduced_lemma is not None:
+                freq_dict[reduced_lemma] += 1
+        return dict(freq_dict)
 
     def ner_tagger(self, text: str, use_spacy=True) -> List[Tuple[str, bool]]:
         """
@@ -160,12 +181,19 @@ class CorpusAnalytics:
         :param use_spacy: flag to use Spacy NER tagger. Note that it runs slowly.
         :return: list of booleans - true indicates named entity
         """
-        sentences = self.sent_tokenizer.tokenize(text)
+        sentences = [
+            sentence.split(" ") for sentence in self.sent_tokenizer.tokenize(text)
+        ]
+        if use_spacy:
+            # Tags are assigned token by token, so tag every sentence in one call
+            # and slice the tags back out per sentence
+            all_ner_tags = iter(
+                tag_ner(iso_code="lat", input_tokens=list(chain.from_iterable(sentences)))
+            )
         tagged_sentences = []
-        for sentence in sentences:
-            tokens = sentence.split(" ")
+        for tokens in sentences:
             if use_spacy:
-                cltk_ner_tags = tag_ner(iso_code="lat", input_tokens=tokens)
+                cltk_ner_tags = list(islice(all_ner_tags, len(tokens)))
             else:
                 cltk_ner_tags = tokens
             ner_tags = []
@@ -187,20 +215,27 @@ class CorpusAnalytics:
         :param filter_ner: filter proper nouns from text
         :return: processed Latin Library text
         """
-        clean_text = self.clean_text(text, lower=True)
+        # Clean once; the lower case text is derived from the cased text used for NER
+        clean_text_ner = self.clean_text(text, lower=False)
+        clean_text = clean_text_ner.lower()
         text_title = text.split("\n")[0]
-        only_alphabetic_pattern = re.compile("[^a-z]")
-        clean_tokens = [
-            only_alphabetic_pattern.sub("", t) for t in clean_text.split(" ")
-        ]  # Remove punc from tokens
+        # Remove punc from tokens. Spaces are kept, so one pass over the whole text
+        # gives the same tokens as one pass per token. Tokens are interned so repeated
+        # words share one string through lemmatization.
+        clean_tokens = list(
+            map(
+                sys.intern,
+                _NON_ALPHABETIC_OR_SPACE_PATTERN.sub("", clean_text).split(" "),
+            )
+        )
         if self.lemmatizer_type == "cltk":
             lemmata = self.lemmatizer.lemmatize(clean_tokens)
         if filter_ner:
-            clean_text_ner = self.clean_text(text, lower=False)
             ner_tags = self.ner_tagger(clean_text_ner, use_spacy=False)
-            filter_lemmata = [
+            # Filter while counting rather than building a filtered copy of lemmata
+            filter_lemmata = (
                 t[0] for t in zip(lemmata, ner_tags) if t[1][1] is not True
-            ]
+            )
             lemmata_frequencies = self.lemmata_freq(filter_lemmata)
         else:
             lemmata_frequencies = self.lemmata_freq(lemmata)
@@ -214,33 +249,105 @@ class CorpusAnalytics:
         return processed_text
 
 
-lemmata_analyzer = CorpusAnalytics("lat", lemmatizer_type="cltk")
-parser = Parser()
+@lru_cache(maxsize=None)
+def _get_lemmata_analyzer() -> CorpusAnalytics:
+    return CorpusAnalytics("lat", lemmatizer_type="cltk")
+
+
+@lru_cache(maxsize=None)
+def _get_parser() -> "Parser":
+    # Importing Whitaker's Words is slow, so defer it to first use
+    from whitakers_words.parser import Parser
+
+    return Parser()
 
 
-def get_lemmata_frequencies(text: str) -> Dict[str, int]:
+def __getattr__(name: str):
+    # Build the analyzer and parser on first use rather than at import time
+    if name == "lemmata_analyzer":
+        return _get_lemmata_analyzer()
+    if name == "parser":
+        return _get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _frequency_cache_key(text: str) -> str:
+    """
+    Hash text together with the cache version, the installed cltk version and the lemma
+    exception table. Pipeline changes not covered by these need _FREQUENCY_CACHE_VERSION bumped.
+    :param text: Latin text
+    :return: hex digest naming the cache entry for text
+    """
+    key = hashlib.blake2b(digest_size=16)
+    cltk_version = importlib.metadata.version("cltk")
+    key.update(f"{_FREQUENCY_CACHE_VERSION}:lat:cltk:{cltk_version}\0".encode("utf-8"))
+    key.update(json.dumps(_load_lemma_exceptions(), sort_keys=True).encode("utf-8"))
+    key.update(b"\0")
+    key.update(text.encode("utf-8"))
+    return key.hexdigest()
+
+
+def get_lemmata_frequencies(
+    text: str, cache_dir: Union[str, None] = None
+) -> Dict[str, int]:
     """
     Get lemmata frequencies for Latin text.
     :param text: Latin text
+    :param cache_dir: optional directory to cache frequencies in, keyed by a hash of text
     :return: lemmata frequencies
     """
-    processed_text = lemmata_analyzer.process_text(text)
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, f"{_frequency_cache_key(text)}.json")
+        if os.path.exists(cache_path):
+            with open(cache_path, "r") as f:
+                return json.load(f)
+    processed_text = _get_lemmata_analyzer().process_text(text)
+    if cache_dir is not None:
+        # Write to a unique temporary file first so an interrupted run never leaves a
+        # partial entry and concurrent runs never write to the same file
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(processed_text.lemmata_frequencies, f, separators=(",", ":"))
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
     return processed_text.lemmata_frequencies
 
 
+@lru_cache(maxsize=2**16)
 def get_definition(word: str) -> str:
     """
     Get definition for Latin word.
     :param word: Latin word
     :return: definition
     """
-    result = parser.parse(word)
+    result = _get_parser().parse(word)
     analyses = result.forms[0].analyses
     analyses_key = next(iter(analyses.items()))
     definitions = analyses_key[1].lexeme.senses
     return ", ".join(definitions)
 
 
+def get_definitions(words: Iterable[str]) -> Dict[str, Union[str, None]]:
+    """
+    Get definitions for many Latin words.
+    Each distinct word is parsed only once, however often it occurs in words.
+    :param words: Latin words
+    :return: dict of word to definition, None if no definition was found
+    """
+    definitions = dict.fromkeys(words)
+    for word in definitions:
+        try:
+            definitions[word] = get_definition(word)
+        except (IndexError, StopIteration):
+            # Raised by get_definition when the parser has no analysis for word
+            definitions[word] = None
+    return definitions
+
+
 if __name__ == "__main__":
     # Load text
     # with open("sample_latin_text.txt", "r") as f:
@@ -251,18 +358,16 @@ if __name__ == "__main__":
     # Get list of words from keys of frequency_dict.json
     with open("frequency_dict.json", "r") as f:
         frequency_dict = json.load(f)
-    words = list(frequency_dict.keys())
-    # For each word, try to get a defition with get_definition and write to file
+    definitions = get_definitions(frequency_dict.keys())
+    # Write each word and its definition to file
     found = 0
     not_found = 0
     with open("definitions.txt", "w") as f:
-        for word in words:
-            try:
-                definition = get_definition(word)
-                f.write(f"{word}: {definition}\n")
-                found += 1
-            except:
-                f.write(f"{word}: None\n")
+        for word, definition in definitions.items():
+            f.write(f"{word}: {definition}\n")
+            if definition is None:
                 not_found += 1
+            else:
+                found += 1
     print(f"Found: {found}")
     print(f"Not found: {not_found}")
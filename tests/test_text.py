@@ -0,0 +1,31 @@
+import pytest
+
+from autocom.text import create_latex_file, iter_words
+
+
+def test_iter_words():
+    lines = ["Galli Caesaris saevitia.\n", "\n", "  [1] 1 Post\temensos\n"]
+    output = list(iter_words(lines))
+    correct = ["Galli", "Caesaris", "saevitia.", "[1]", "1", "Post", "emensos"]
+    assert output == correct
+
+
+def test_create_latex_file(tmp_path):
+    input_filename = tmp_path / "input.txt"
+    input_filename.write_text("Post emensos\n\ninsuperabilis  expeditionis\neventus")
+    output_filename = tmp_path / "output.tex"
+    create_latex_file(input_filename, output_filename, "Title", "Author", words_per_page=2)
+    output = output_filename.read_text()
+    assert output.startswith("\\documentclass[14pt]{book}\n")
+    assert "\\title{Title}\n\\author{Author}\n" in output
+    correct_body = "Post emensos \n\n\\newpage\n\\null\n\\newpage\n" \
+                   "insuperabilis expeditionis \n\n\\newpage\n\\null\n\\newpage\n" \
+                   "eventus \\end{document}"
+    assert output.endswith("\\doublespacing\n" + correct_body)
+
+
+def test_create_latex_file_words_per_page(tmp_path):
+    input_filename = tmp_path / "input.txt"
+    input_filename.write_text("Post emensos")
+    with pytest.raises(ValueError):
+        create_latex_file(input_filename, tmp_path / "output.tex", "Title", "Author", words_per_page=0)
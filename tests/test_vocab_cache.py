@@ -0,0 +1,64 @@
+from autocom import vocab
+from autocom.vocab import ProcessedText, get_lemmata_frequencies
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.calls = 0
+
+    def process_text(self, text):
+        self.calls += 1
+        return ProcessedText(
+            title=text,
+            raw_text=text,
+            clean_text=text,
+            lemmata=[],
+            lemmata_frequencies={"arma": 2, "cano": 1},
+        )
+
+
+def test_get_lemmata_frequencies_cache(monkeypatch, tmp_path):
+    analyzer = FakeAnalyzer()
+    monkeypatch.setattr(vocab, "_get_lemmata_analyzer", lambda: analyzer)
+    cache_dir = tmp_path / "cache"
+    correct = {"arma": 2, "cano": 1}
+    # Miss: analyzes the text and writes a single cache entry
+    output = get_lemmata_frequencies("arma virumque cano arma", cache_dir=str(cache_dir))
+    assert output == correct
+    assert analyzer.calls == 1
+    assert [p.suffix for p in cache_dir.iterdir()] == [".json"]
+    # Hit: returns the same dict without analyzing
+    output = get_lemmata_frequencies("arma virumque cano arma", cache_dir=str(cache_dir))
+    assert output == correct
+    assert type(output) is dict
+    assert analyzer.calls == 1
+    # Different text misses
+    get_lemmata_frequencies("arma virumque cano", cache_dir=str(cache_dir))
+    assert analyzer.calls == 2
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_get_lemmata_frequencies_cache_version(monkeypatch, tmp_path):
+    analyzer = FakeAnalyzer()
+    monkeypatch.setattr(vocab, "_get_lemmata_analyzer", lambda: analyzer)
+    get_lemmata_frequencies("arma virumque cano", cache_dir=str(tmp_path))
+    monkeypatch.setattr(vocab, "_FREQUENCY_CACHE_VERSION", vocab._FREQUENCY_CACHE_VERSION + 1)
+    get_lemmata_frequencies("arma virumque cano", cache_dir=str(tmp_path))
+    assert analyzer.calls == 2
+
+
+def test_get_lemmata_frequencies_cache_cltk_version(monkeypatch, tmp_path):
+    analyzer = FakeAnalyzer()
+    monkeypatch.setattr(vocab, "_get_lemmata_analyzer", lambda: analyzer)
+    monkeypatch.setattr(vocab.importlib.metadata, "version", lambda name: "1.0.0")
+    get_lemmata_frequencies("arma virumque cano", cache_dir=str(tmp_path))
+    monkeypatch.setattr(vocab.importlib.metadata, "version", lambda name: "1.1.0")
+    get_lemmata_frequencies("arma virumque cano", cache_dir=str(tmp_path))
+    assert analyzer.calls == 2
+
+
+def test_get_lemmata_frequencies_without_cache(monkeypatch):
+    analyzer = FakeAnalyzer()
+    monkeypatch.setattr(vocab, "_get_lemmata_analyzer", lambda: analyzer)
+    assert get_lemmata_frequencies("arma") == {"arma": 2, "cano": 1}
+    assert analyzer.calls == 1
@@ -0,0 +1,39 @@
+import pytest
+
+from autocom import vocab
+from autocom.vocab import get_definitions
+
+
+def test_get_definitions(monkeypatch):
+    calls = []
+
+    def get_definition(word):
+        calls.append(word)
+        if word == "zzz":
+            # Parser found no forms for word
+            return [][0]
+        if word == "yyy":
+            # Parser found a form with no analyses
+            return next(iter({}.items()))
+        return f"{word} definition"
+
+    monkeypatch.setattr(vocab, "get_definition", get_definition)
+    output = get_definitions(["cano", "arma", "zzz", "cano", "yyy", "arma"])
+    assert output == {
+        "cano": "cano definition",
+        "arma": "arma definition",
+        "zzz": None,
+        "yyy": None,
+    }
+    assert list(output) == ["cano", "arma", "zzz", "yyy"]
+    assert calls == ["cano", "arma", "zzz", "yyy"]
+
+
+def test_get_definitions_parser_error(monkeypatch):
+    def get_parser():
+        raise ImportError("No module named 'whitakers_words'")
+
+    monkeypatch.setattr(vocab, "_get_parser", get_parser)
+    vocab.get_definition.cache_clear()
+    with pytest.raises(ImportError):
+        get_definitions(["arma", "virum", "cano"])